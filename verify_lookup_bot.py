@@ -7,14 +7,29 @@ Full replacement file - paste into your project and restart the bot.
 
 import os
 import csv
+import asyncio
+import atexit
+import contextlib
 import re
 import random
 import time
-from typing import Optional, List, Tuple, Dict, Any
+from collections import defaultdict, deque
+from typing import Optional, List, Tuple, Dict, Any, IO
 from datetime import datetime, timezone
-from difflib import SequenceMatcher
 
 from aiogram import Bot, Dispatcher, types, executor
+from aiogram.utils import json as aiogram_json
+from rapidfuzz import process, fuzz
+
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # ----- CONFIG -----
 TG_TOKEN = os.getenv("TG_TOKEN")
@@ -29,32 +44,59 @@ ADMIN_IDS = set(int(x) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip
 
 RATE_LIMIT_COUNT = int(os.getenv("RATE_LIMIT_COUNT", "6"))
 RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", "60"))
+RATE_SWEEP_INTERVAL = int(os.getenv("RATE_SWEEP_INTERVAL", "300"))
 
 FUZZY_MATCH_CUTOFF = float(os.getenv("FUZZY_MATCH_CUTOFF", "0.6"))
 FUZZY_MAX_SUGGEST = int(os.getenv("FUZZY_MAX_SUGGEST", "5"))
 
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.25"))
+LOG_FLUSH_MAX_ROWS = int(os.getenv("LOG_FLUSH_MAX_ROWS", "100"))
+
+# Telegram rejects messages over 4096 chars; leave headroom
+MESSAGE_CHUNK_SIZE = 3500
+# cap on messages per admin reply, to stay clear of Telegram's per-chat flood limit
+MESSAGE_MAX_CHUNKS = int(os.getenv("MESSAGE_MAX_CHUNKS", "4"))
+
 # ----- BOT SETUP -----
+if uvloop is not None:
+    uvloop.install()
+
+# aiogram 2 routes request/response (de)serialization through aiogram.utils.json
+if orjson is not None:
+    aiogram_json.dumps = lambda data: orjson.dumps(data).decode()
+    aiogram_json.loads = orjson.loads
+
 bot = Bot(token=TG_TOKEN)
 dp = Dispatcher(bot)
 
-DATA: List[Dict[str, str]] = []
+DATA: List["StaffRow"] = []
 LAST_RELOAD: Optional[datetime] = None
 
-_rate_store: Dict[int, List[float]] = {}
+# Lookup indexes, rebuilt together with DATA in reload_data()
+IDX_EMAIL: Dict[str, "StaffRow"] = {}
+IDX_TG: Dict[str, "StaffRow"] = {}
+IDX_X: Dict[str, "StaffRow"] = {}
+IDX_NAME_LOWER: Dict[str, "StaffRow"] = {}
+IDX_RAW: Dict[str, "StaffRow"] = {}
+IDX_DOMAIN: Dict[str, List["StaffRow"]] = defaultdict(list)
+FIELD_TO_INDEX: Dict[str, Dict[str, "StaffRow"]] = {}
+_UNIQUE_NAMES: Tuple[str, ...] = ()
+
+_rate_store: Dict[int, "deque[float]"] = {}
+_rate_last_sweep = 0.0
 
 # ----- GREETING DETECTION -----
-GREETINGS = {
+GREETINGS = frozenset({
     "hi", "hello", "hey", "hiya", "good morning", "good afternoon", "good evening", "gm", "hey there",
     "مرحبا", "اهلا", "أهلا", "السلام عليكم", "سلام", "صباح الخير", "مساء الخير",
     "salam", "salaam",
-}
-GREETINGS_RE = re.compile(r"^\s*(?:{})[\s!,.؟?]*$".format("|".join(re.escape(g) for g in GREETINGS)), flags=re.IGNORECASE)
+})
 
 def is_greeting(text: Optional[str]) -> bool:
     if not text:
         return False
     t = text.strip()
-    if GREETINGS_RE.match(t):
+    if t.rstrip("!,.?؟ \t\r\n").lower() in GREETINGS:
         return True
     tokens = t.split()
     if tokens and tokens[0].lower() in GREETINGS and len(tokens) <= 3:
@@ -62,13 +104,90 @@ def is_greeting(text: Optional[str]) -> bool:
     return False
 
 # ----- UTIL: LOGGING -----
-def _append_csv_log(path: str, header: List[str], row: List[Any]) -> None:
-    header_needed = not os.path.exists(path)
-    with open(path, "a", newline="", encoding="utf-8") as f:
+# Handlers only enqueue rows; _log_writer() drains the queue and appends them in batches.
+_LOG_QUEUE: "asyncio.Queue[Tuple[str, List[str], List[str]]]" = asyncio.Queue()
+_log_writer_task: Optional["asyncio.Task[None]"] = None
+
+_LOG_FILES: Dict[str, Tuple[IO[str], Any]] = {}
+
+def _is_stale_handle(f: IO[str], path: str) -> bool:
+    # the file was rotated or deleted out from under the cached handle
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return True
+    fst = os.fstat(f.fileno())
+    return (st.st_ino, st.st_dev) != (fst.st_ino, fst.st_dev)
+
+def _get_log_writer(path: str, header: List[str]) -> Any:
+    entry = _LOG_FILES.get(path)
+    if entry is not None and _is_stale_handle(entry[0], path):
+        entry[0].close()
+        entry = None
+    if entry is None:
+        header_needed = not os.path.exists(path)
+        f = open(path, "a", newline="", buffering=1, encoding="utf-8")
         writer = csv.writer(f)
         if header_needed:
             writer.writerow(header)
-        writer.writerow([str(x) if x is not None else "" for x in row])
+        entry = _LOG_FILES[path] = (f, writer)
+    return entry[1]
+
+def _close_log_files() -> None:
+    for f, _ in _LOG_FILES.values():
+        try:
+            f.close()
+        except Exception:
+            pass
+    _LOG_FILES.clear()
+
+atexit.register(_close_log_files)
+
+def _write_csv_rows(path: str, header: List[str], rows: List[List[str]]) -> None:
+    _get_log_writer(path, header).writerows(rows)
+
+def _flush_log_batch(batch: List[Tuple[str, List[str], List[str]]]) -> None:
+    grouped: Dict[str, Tuple[List[str], List[List[str]]]] = {}
+    for path, header, row in batch:
+        grouped.setdefault(path, (header, []))[1].append(row)
+    for path, (header, rows) in grouped.items():
+        try:
+            _write_csv_rows(path, header, rows)
+        except Exception as e:
+            print(f"Error writing log {path}: {e}")
+
+async def _log_writer() -> None:
+    loop = asyncio.get_event_loop()
+    while True:
+        batch = [await _LOG_QUEUE.get()]
+        deadline = loop.time() + LOG_FLUSH_INTERVAL
+        try:
+            while len(batch) < LOG_FLUSH_MAX_ROWS:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(_LOG_QUEUE.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        finally:
+            # also runs on cancellation so rows already dequeued are not lost
+            _flush_log_batch(batch)
+
+def _drain_log_queue() -> None:
+    batch = []
+    while not _LOG_QUEUE.empty():
+        batch.append(_LOG_QUEUE.get_nowait())
+    if batch:
+        _flush_log_batch(batch)
+
+def _append_csv_log(path: str, header: List[str], row: List[Any]) -> None:
+    _LOG_QUEUE.put_nowait((path, header, [str(x) if x is not None else "" for x in row]))
+
+def _tail_lines(path: str, n: int) -> List[str]:
+    # deque streams the file and only ever holds the last n lines
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return list(deque(f, maxlen=n))
 
 def log_not_found(raw_input: str, query_type: str, value: str, user_id: int, user_name: Optional[str]) -> None:
     _append_csv_log(NOT_FOUND_LOG, ["timestamp", "user_id", "user_name", "raw_input", "query_type", "value"],
@@ -79,143 +198,249 @@ def log_lookup(found: bool, raw_input: str, query_type: str, value: str, user_id
                     [datetime.now(timezone.utc).isoformat(), user_id, user_name or "", raw_input, query_type, value, "1" if found else "0", matched_name])
 
 # ----- CSV LOADER -----
-def load_dataset(path: str) -> List[Dict[str, str]]:
-    rows: List[Dict[str, str]] = []
-    email_aliases = {"email", "e-mail", "email_address", "emailaddress", "mail", "work_email", "e_mail"}
+EMAIL_ALIASES = frozenset({"email", "e-mail", "email_address", "emailaddress", "mail", "work_email", "e_mail"})
+ACTIVE_VALUES = frozenset({"yes", "y", "true", "1"})
+
+class StaffRow:
+    """One staff record; only the columns the bot reads are kept."""
+    __slots__ = ("full_name", "full_name_lower", "job_title", "department", "location",
+                 "email", "email_norm", "tg_username", "tg_norm", "x_username", "x_norm", "is_active")
+
+    def __init__(self, *, full_name: str, full_name_lower: str, job_title: str, department: str,
+                 location: str, email: str, email_norm: str, tg_username: str, tg_norm: str,
+                 x_username: str, x_norm: str, is_active: bool) -> None:
+        self.full_name = full_name
+        self.full_name_lower = full_name_lower
+        self.job_title = job_title
+        self.department = department
+        self.location = location
+        self.email = email
+        self.email_norm = email_norm
+        self.tg_username = tg_username
+        self.tg_norm = tg_norm
+        self.x_username = x_username
+        self.x_norm = x_norm
+        self.is_active = is_active
+
+def load_dataset(path: str) -> List[StaffRow]:
+    rows: List[StaffRow] = []
     try:
-        with open(path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for r in reader:
-                row: Dict[str, str] = {}
-                for orig_key, value in r.items():
-                    if orig_key is None:
-                        continue
-                    clean_key = orig_key.strip().lower().lstrip("\ufeff").strip()
-                    row[clean_key] = (value or "").strip()
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                return rows
+            width = len(header)
+            # resolve column positions once; a later duplicate header wins, as with DictReader.
+            # Missing columns point at index `width`, which every row is padded to hold as "".
+            cols = {h.strip().lower().lstrip("\ufeff").strip(): i for i, h in enumerate(header)}
+            # first non-empty value across the known aliases, then any other *email* column
+            email_names = sorted((c for c in cols if c in EMAIL_ALIASES), key=lambda c: c != "email")
+            email_names += [c for c in cols if "email" in c and c not in EMAIL_ALIASES]
+            email_idx = [cols[c] for c in email_names]
+            i_email = cols.get("email", width)
+            i_name = cols.get("full_name", width)
+            i_job = cols.get("job_title", width)
+            i_dept = cols.get("department", width)
+            i_loc = cols.get("location", width)
+            i_tg = cols.get("tg_username", width)
+            i_x = cols.get("x_username", width)
+            i_works = cols.get("works_at_pionex", width)
+            pad = [""] * (width + 1)
+            for values in reader:
+                if not values:
+                    continue
+                # extra fields (e.g. a trailing comma) are dropped, short rows padded
+                if len(values) > width:
+                    del values[width:]
+                values += pad[len(values):]
                 email_val = ""
-                if row.get("email"):
-                    email_val = row.get("email")
-                else:
-                    for alias in email_aliases:
-                        if row.get(alias):
-                            email_val = row.get(alias)
-                            break
-                if not email_val:
-                    for k, v in row.items():
-                        if "email" in k and v:
-                            email_val = v
-                            break
-                row["email_norm"] = (email_val or "").lower().strip()
-                row["tg_norm"] = row.get("tg_username", "").lower().lstrip("@").strip()
-                row["x_norm"] = row.get("x_username", "").lower().lstrip("@").strip()
-                row["full_name_norm"] = row.get("full_name", "").strip()
-                rows.append(row)
+                for i in email_idx:
+                    email_val = values[i].strip()
+                    if email_val:
+                        break
+                full_name = values[i_name].strip()
+                # handles are stored without "@" so rendering can prefix it directly
+                tg = values[i_tg].strip().lstrip("@")
+                x = values[i_x].strip().lstrip("@")
+                rows.append(StaffRow(
+                    full_name=full_name,
+                    full_name_lower=full_name.lower(),
+                    job_title=values[i_job].strip(),
+                    department=values[i_dept].strip(),
+                    location=values[i_loc].strip(),
+                    email=values[i_email].strip(),
+                    email_norm=email_val.lower(),
+                    tg_username=tg,
+                    tg_norm=tg.lower().strip(),
+                    x_username=x,
+                    x_norm=x.lower().strip(),
+                    is_active=values[i_works].strip().lower() in ACTIVE_VALUES,
+                ))
     except FileNotFoundError:
         print("DATA FILE NOT FOUND:", path)
     except Exception as e:
         print(f"Error loading CSV data from {path}: {e}")
     return rows
 
+def build_indexes(rows: List[StaffRow]) -> Tuple[Dict[str, Any], ...]:
+    # setdefault keeps the first matching row, same as the old linear scans
+    idx_email: Dict[str, StaffRow] = {}
+    idx_tg: Dict[str, StaffRow] = {}
+    idx_x: Dict[str, StaffRow] = {}
+    idx_name: Dict[str, StaffRow] = {}
+    idx_raw: Dict[str, StaffRow] = {}
+    idx_domain: Dict[str, List[StaffRow]] = defaultdict(list)
+    for r in rows:
+        em = r.email_norm
+        tg = r.tg_norm
+        x = r.x_norm
+        name = r.full_name_lower
+        if em:
+            idx_email.setdefault(em, r)
+            if "@" in em:
+                idx_domain[em.rsplit("@", 1)[1]].append(r)
+        if tg:
+            idx_tg.setdefault(tg, r)
+        if x:
+            idx_x.setdefault(x, r)
+        if name:
+            idx_name.setdefault(name, r)
+        for key in (tg, x, em):
+            if key:
+                idx_raw.setdefault(key, r)
+    return idx_email, idx_tg, idx_x, idx_name, idx_raw, idx_domain
+
 def reload_data() -> None:
-    global DATA, LAST_RELOAD
+    global DATA, LAST_RELOAD, IDX_EMAIL, IDX_TG, IDX_X, IDX_NAME_LOWER, IDX_RAW, IDX_DOMAIN, FIELD_TO_INDEX, _UNIQUE_NAMES
     DATA = load_dataset(DATA_PATH)
+    IDX_EMAIL, IDX_TG, IDX_X, IDX_NAME_LOWER, IDX_RAW, IDX_DOMAIN = build_indexes(DATA)
+    FIELD_TO_INDEX = {"email_norm": IDX_EMAIL, "tg_norm": IDX_TG, "x_norm": IDX_X,
+                      "raw": IDX_RAW, "name": IDX_NAME_LOWER}
+    # dict.fromkeys dedups while keeping CSV order stable for suggestion ties
+    _UNIQUE_NAMES = tuple(dict.fromkeys(r.full_name for r in DATA if r.full_name))
     LAST_RELOAD = datetime.now(timezone.utc)
     print(f"Loaded {len(DATA)} staff rows from {DATA_PATH} at {LAST_RELOAD.isoformat()}")
 
 # ----- PARSE USER INPUT -----
+# email, x/twitter and telegram links in one pass; m.lastgroup names the field
+_PARSE = re.compile(
+    r"(?:mailto:)?(?P<email_norm>[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})"
+    r"|(?:https?://)?(?:www\.)?(?:x\.com|twitter\.com)/@?(?P<x_norm>[A-Za-z0-9_]{1,15})(?:[/?#]|$)"
+    r"|(?:https?://)?(?:www\.)?(?:t\.me|telegram\.me)/@?(?P<tg_norm>[A-Za-z0-9_]{3,64})(?:[/?#]|$)",
+    re.IGNORECASE,
+)
+_RE_HANDLE = re.compile(r"^@?([A-Za-z0-9_]{1,64})$")
+_RE_NAME = re.compile(r"^[A-Za-z\u00C0-\u024F0-9\-\s\.'`]{2,100}$")
+_RE_DOMAIN = re.compile(r"@?([A-Za-z0-9\.-]+\.[A-Za-z]{2,})$")
+
 def parse_query(text: str) -> Tuple[Optional[str], Optional[str]]:
     t = text.strip().strip("`<> ")
 
-    # email
-    m = re.search(r"(?:mailto:)?([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})", t, flags=re.IGNORECASE)
-    if m:
-        return "email_norm", m.group(1).lower()
-
-    # x/twitter
-    m = re.search(r"(?:https?://)?(?:www\.)?(?:x\.com|twitter\.com)/@?([A-Za-z0-9_]{1,15})(?:[/?#]|$)", t, flags=re.IGNORECASE)
+    # email / x / telegram link
+    m = _PARSE.search(t)
     if m:
-        return "x_norm", m.group(1).lower()
-
-    # telegram
-    m = re.search(r"(?:https?://)?(?:www\.)?(?:t\.me|telegram\.me)/@?([A-Za-z0-9_]{3,64})(?:[/?#]|$)", t, flags=re.IGNORECASE)
-    if m:
-        return "tg_norm", m.group(1).lower()
+        return m.lastgroup, m.group(m.lastgroup).lower()
 
     # plain handle
-    m = re.match(r"^@?([A-Za-z0-9_]{1,64})$", t)
+    m = _RE_HANDLE.match(t)
     if m:
         return "raw", m.group(1).lower()
 
     # name-like
-    if re.match(r"^[A-Za-z\u00C0-\u024F0-9\-\s\.'`]{2,100}$", t):
+    if _RE_NAME.match(t):
         return "name", t.strip()
 
     # domain
-    m = re.search(r"@?([A-Za-z0-9\.-]+\.[A-Za-z]{2,})$", t)
+    m = _RE_DOMAIN.search(t)
     if m:
         return "email_domain", m.group(1).lower()
 
     return None, None
 
 # ----- FIND & FUZZY -----
-def find_record(field: str, value: str) -> Optional[Dict[str, str]]:
+def find_record(field: str, value: str) -> Optional[StaffRow]:
     value = value.strip().lower()
-    if field in ("email_norm", "tg_norm", "x_norm"):
-        for r in DATA:
-            if r.get(field, "").lower() == value:
-                return r
-        return None
-
-    if field == "raw":
-        for r in DATA:
-            if r.get("tg_norm", "") == value or r.get("x_norm", "") == value or r.get("email_norm", "") == value:
-                return r
-        return None
-
-    if field == "name":
-        for r in DATA:
-            if r.get("full_name_norm", "").lower() == value.lower():
-                return r
-        return None
-
+    idx = FIELD_TO_INDEX.get(field)
+    if idx is not None:
+        return idx.get(value)
     if field == "email_domain":
-        for r in DATA:
-            em = r.get("email_norm", "")
-            if em and em.endswith("@" + value):
-                return r
-        return None
-
+        rows = IDX_DOMAIN.get(value)
+        return rows[0] if rows else None
     return None
 
 def fuzzy_name_suggestions(name_value: str, max_suggest: int = FUZZY_MAX_SUGGEST) -> List[Tuple[str, float]]:
-    names = [r.get("full_name_norm", "") for r in DATA if r.get("full_name_norm")]
-    scored: List[Tuple[str, float]] = []
-    for n in set(names):
-        ratio = SequenceMatcher(None, name_value.lower(), n.lower()).ratio()
-        if ratio >= FUZZY_MATCH_CUTOFF:
-            scored.append((n, ratio))
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return scored[:max_suggest]
+    matches = process.extract(name_value, _UNIQUE_NAMES, scorer=fuzz.ratio, processor=str.lower,
+                              score_cutoff=FUZZY_MATCH_CUTOFF * 100, limit=max_suggest)
+    return [(n, score / 100.0) for n, score, _ in matches]
 
 # ----- RATE LIMITING -----
+def _rate_sweep(window_start: float) -> None:
+    # drop users with no hits inside the window so the store doesn't grow unbounded
+    stale = [uid for uid, lst in _rate_store.items() if not lst or lst[-1] <= window_start]
+    for uid in stale:
+        del _rate_store[uid]
+
 def rate_allow(user_id: int) -> Tuple[bool, int]:
-    now = time.time()
-    lst = _rate_store.get(user_id, [])
+    global _rate_last_sweep
+    now = time.monotonic()
     window_start = now - RATE_LIMIT_WINDOW
-    lst = [t for t in lst if t > window_start]
+    if now - _rate_last_sweep >= RATE_SWEEP_INTERVAL:
+        _rate_sweep(window_start)
+        _rate_last_sweep = now
+    lst = _rate_store.get(user_id)
+    if lst is None:
+        lst = _rate_store[user_id] = deque()
+    while lst and lst[0] <= window_start:
+        lst.popleft()
     if len(lst) >= RATE_LIMIT_COUNT:
         retry_after = int(lst[0] + RATE_LIMIT_WINDOW - now) if lst else RATE_LIMIT_WINDOW
-        _rate_store[user_id] = lst
         return False, max(1, retry_after)
     lst.append(now)
-    _rate_store[user_id] = lst
     return True, 0
 
 # ----- HELPERS -----
+_ANOTHER = frozenset({"another", "verify another", "verifyanother"})
+_QUOTES = (
+    "Keep going — small wins add up",
+    "Progress over perfection — keep moving",
+    "One step forward is still progress",
+    "Stay focused and trust the process",
+    "Do a little today that your future self will thank you for",
+)
+
 def welcome_msg() -> str:
     return ("Welcome to the Pionex Staff Lookup Bot\n\n"
             "Send an email (example@pionex.com), Telegram/X handle or link, or a full name. The bot will check our records and reply.")
 
+def result_preface(user: types.User) -> str:
+    first = (user.first_name or user.username or "").strip() or "there"
+    return f"Hi {first}! {random.choice(_QUOTES)}\n\n"
+
+async def answer_tail(message: types.Message, label: str, lines: List[str]) -> None:
+    # Pack the newest lines into at most MESSAGE_MAX_CHUNKS messages, splitting only
+    # on line boundaries; older lines that don't fit are dropped.
+    chunks: List[List[str]] = []
+    size = MESSAGE_CHUNK_SIZE + 1
+    kept = 0
+    for line in reversed(lines):
+        line = line[:MESSAGE_CHUNK_SIZE]
+        if size + len(line) > MESSAGE_CHUNK_SIZE:
+            if len(chunks) == MESSAGE_MAX_CHUNKS:
+                break
+            chunks.append([])
+            size = 0
+        chunks[-1].append(line)
+        size += len(line)
+        kept += 1
+    texts = ["".join(reversed(c)) for c in reversed(chunks)] or [""]
+    header = "Last %d lines of %s:" % (kept, label)
+    if kept < len(lines):
+        header += " (%d older lines omitted, request fewer lines)" % (len(lines) - kept)
+    texts[0] = header + "\n\n" + texts[0]
+    for text in texts:
+        await message.answer(text)
+
 def greeting_prompt(first_name: str) -> str:
     fn = first_name or "there"
     return f"Hi {fn}!\n\nCould you please send the username, link, or email you'd like me to verify if they work at Pionex?\n\nExamples:\n• @username\n• t.me/username\n• user@pionex.com"
@@ -256,9 +481,8 @@ async def cmd_logs(message: types.Message):
     if len(parts) > 1 and parts[1].isdigit():
         n = min(2000, int(parts[1]))
     if os.path.exists(VERIFY_LOG):
-        with open(VERIFY_LOG, "r", encoding="utf-8", errors="replace") as f:
-            lines = f.readlines()[-n:]
-            await message.answer("Last %d lines of verify log:\n\n%s" % (len(lines), "".join(lines[-n:])))
+        lines = _tail_lines(VERIFY_LOG, n)
+        await answer_tail(message, "verify log", lines)
     else:
         await message.answer("Log file not found: %s" % VERIFY_LOG)
 
@@ -273,30 +497,35 @@ async def cmd_recent_notfound(message: types.Message):
     if len(parts) > 1 and parts[1].isdigit():
         n = min(1000, int(parts[1]))
     if os.path.exists(NOT_FOUND_LOG):
-        with open(NOT_FOUND_LOG, "r", encoding="utf-8", errors="replace") as f:
-            lines = f.readlines()[-n:]
-            await message.answer("Last %d lines of not_found_log:\n\n%s" % (len(lines), "".join(lines[-n:])))
+        lines = _tail_lines(NOT_FOUND_LOG, n)
+        await answer_tail(message, "not_found_log", lines)
     else:
         await message.answer("not_found_log not present.")
 
 @dp.message_handler()
 async def handle_query(message: types.Message) -> None:
     raw = (message.text or "").strip()
+    user = message.from_user
     # rate limit
-    allowed, retry = rate_allow(message.from_user.id)
+    allowed, retry = rate_allow(user.id)
     if not allowed:
         await message.answer(f"You're sending requests too fast. Try again in {retry} seconds.")
         return
 
-    low = raw.lower().strip()
-    # Accept typed "another" as the same action the former button did
-    if low in ("another", "verify another", "verifyanother"):
+    # Nothing parseable fits in a single character; skip greeting/parse work entirely
+    if len(raw) < 2:
+        await message.answer(welcome_msg())
+        return
+
+    # Accept typed "another" as the same action the former button did;
+    # the length guard skips lowercasing links/emails that can't match anyway
+    if len(raw) <= 16 and raw.lower() in _ANOTHER:
         await message.answer("Sure — send the username, link, or email you'd like me to check.")
         return
 
     # Greeting
     if is_greeting(raw):
-        first = (message.from_user.first_name or "").strip()
+        first = (user.first_name or "").strip()
         await message.answer(greeting_prompt(first))
         return
 
@@ -319,69 +548,60 @@ async def handle_query(message: types.Message) -> None:
         suggestions = fuzzy_name_suggestions(value)
         if suggestions:
             suggestions_text = "\n".join(f"- {name}  (score {score:.2f})" for name, score in suggestions)
-            log_lookup(False, raw, field, value, message.from_user.id, message.from_user.username or "", matched_name="")
+            log_lookup(False, raw, field, value, user.id, user.username or "", matched_name="")
             await message.answer("No exact match found. Close matches:\n\n" + suggestions_text + "\n\nIf one is correct, resend the exact name shown.")
             return
 
     if not rec:
-        log_not_found(raw, field, value, message.from_user.id, message.from_user.username or "")
-        log_lookup(False, raw, field, value, message.from_user.id, message.from_user.username or "", matched_name="")
-        first = (message.from_user.first_name or message.from_user.username or "").strip() or "there"
-        quotes = [
-            "Keep going — small wins add up",
-            "Progress over perfection — keep moving",
-            "One step forward is still progress",
-            "Stay focused and trust the process",
-            "Do a little today that your future self will thank you for"
-        ]
-        quote = random.choice(quotes)
-        preface = f"Hi {first}! {quote}\n\n"
+        log_not_found(raw, field, value, user.id, user.username or "")
+        log_lookup(False, raw, field, value, user.id, user.username or "", matched_name="")
+        preface = result_preface(user)
         friendly_msg = (f"Sorry — I couldn't find {raw} in the official Pionex staff records.\n\n"
                         "Please double-check the username/link or email and try again.\nIf you want, resend the username or link and I'll check again.")
         await message.answer(preface + friendly_msg)
         return
 
-    name = rec.get("full_name", "(no name)")
-    job = rec.get("job_title", "(no job title)")
-    works = rec.get("works_at_pionex", "").lower()
-    status_active = works in ("yes", "y", "true", "1")
-    status_header = "STAFF FOUND & ACTIVE" if status_active else "RECORD FOUND, BUT INACTIVE"
-    status_text = "Active Pionex Staff" if status_active else "NOT currently active at Pionex"
+    name = rec.full_name or "(no name)"
+    job = rec.job_title or "(no job title)"
+    status_header = "STAFF FOUND & ACTIVE" if rec.is_active else "RECORD FOUND, BUT INACTIVE"
+    status_text = "Active Pionex Staff" if rec.is_active else "NOT currently active at Pionex"
 
     extra = []
-    if rec.get("department"):
-        extra.append(f"Department: {rec.get('department')}")
-    if rec.get("location"):
-        extra.append(f"Location: {rec.get('location')}")
-    if rec.get("email"):
-        extra.append(f"Email: {rec.get('email')}")
-    if rec.get("tg_username"):
-        extra.append(f"Telegram: @{rec.get('tg_username').lstrip('@')}")
-    if rec.get("x_username"):
-        extra.append(f"X: @{rec.get('x_username').lstrip('@')}")
+    if rec.department:
+        extra.append(f"Department: {rec.department}")
+    if rec.location:
+        extra.append(f"Location: {rec.location}")
+    if rec.email:
+        extra.append(f"Email: {rec.email}")
+    if rec.tg_username:
+        extra.append(f"Telegram: @{rec.tg_username}")
+    if rec.x_username:
+        extra.append(f"X: @{rec.x_username}")
 
     extra_text = "\n".join(extra)
     msg = (f"{status_header}\n\nName: {name}\nJob Title: {job}\nStatus: {status_text}\n\n")
     if extra_text:
         msg += extra_text
 
-    first = (message.from_user.first_name or message.from_user.username or "").strip() or "there"
-    motivational = [
-        "Keep going — small wins add up",
-        "Progress over perfection — keep moving",
-        "One step forward is still progress",
-        "Stay focused and trust the process",
-        "Do a little today that your future self will thank you for"
-    ]
-    preface = f"Hi {first}! {random.choice(motivational)}\n\n"
-
-    log_lookup(True, raw, field, value, message.from_user.id, message.from_user.username or "", matched_name=name)
+    preface = result_preface(user)
+
+    log_lookup(True, raw, field, value, user.id, user.username or "", matched_name=name)
     await message.answer(preface + msg)
 
 # ----- STARTUP -----
 async def on_startup(dp: Dispatcher) -> None:
+    global _log_writer_task
     reload_data()
+    _log_writer_task = asyncio.ensure_future(_log_writer())
     print("Bot started. Admins:", ADMIN_IDS)
 
+async def on_shutdown(dp: Dispatcher) -> None:
+    if _log_writer_task is not None:
+        _log_writer_task.cancel()
+        # let the writer's finally flush its in-flight batch before draining the rest
+        with contextlib.suppress(asyncio.CancelledError):
+            await _log_writer_task
+    _drain_log_queue()
+
 if __name__ == "__main__":
-    executor.start_polling(dp, skip_updates=True, on_startup=on_startup)
+    executor.start_polling(dp, skip_updates=True, on_startup=on_startup, on_shutdown=on_shutdown)